@@ -1,229 +1,390 @@
+import os
 import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from pptx2md import convert, ConversionConfig
 
+_HEADER = """---
+defaults:
+  layout: two-cols
+mdc: true
+fonts:
+  mono: Cascadia Mono
+  sans: Atkinson Hyperlegible
+layout: cover
+---
+
+# {title}
+"""
+_SEP_DEFAULT = "---\n\n"
+_SEP_FULL = "---\nlayout: full\n---\n\n"
+_SEP_END = "\n---\nlayout: end\n---\n"
+_BULLET_PREFIX = "  * "
+_HEADER_PREFIX = "# "
+
+# Mojibake and escape sequences fixed by SlidevConverter.clean_text
+_CLEAN_REPLACEMENTS = {
+    'Ã¢â‚¬â„¢': "'",
+    'Ã¢â‚¬Å"': '"',
+    'Ã¢â‚¬': '"',
+    'Ã¢â‚¬Ëœ': "'",
+    'â€œ': '"',
+    'â€': '"',
+    'â€™': "'",
+    '\\,': ',',
+}
+
+# Slide layouts returned by SlidevConverter.process_slide_content; interned
+# so callers can compare them with `is`
+LAYOUT_TWOCOLS = sys.intern('two-cols')
+LAYOUT_DEFAULT = sys.intern('default')
+LAYOUT_FULL = sys.intern('full')
+
+# Line kinds returned by SlidevConverter._classify
+_LINE_EMPTY = sys.intern('empty')
+_LINE_HEADING = sys.intern('heading')
+_LINE_BULLET = sys.intern('bullet')
+_LINE_HEADER = sys.intern('header')
+_LINE_TEXT = sys.intern('text')
+
 
 class SlidevConverter:
     def __init__(self):
         self.image_pattern = re.compile(r'!\[([^\]]*)\]\(([^)]+)\)')
 
+        # clean_text
+        # Replacements and stray-backslash removal run as one pass, dispatched
+        # on the named group that matched. Alternatives keep the table's order
+        # so that, like the old chain of str.replace calls, earlier entries win
+        # over later ones. A backslash counts as stray when followed by the
+        # "\\," that is about to be replaced, as it would after replacement.
+        self._pat_cleanup = re.compile(
+            '(?P<replace>' + '|'.join(map(re.escape, _CLEAN_REPLACEMENTS)) + ')'
+            r'|(?P<stray_backslash>\\(?!\\(?!,)|[*_\[\]]))'
+        )
+        self._pat_multispace = re.compile(r'  +')
+
+        # normalize_formatting
+        self._pat_nested_bold = re.compile(r'__\s*\*\*\s*([^*]+?)\s*\*\*\s*__')
+        self._pat_nested_italic = re.compile(r'__\s*_([^_]+?)_\s*__')
+        self._pat_split_bold = re.compile(r'\*([a-z])\*([a-z]+)\*__')
+        self._pat_under_star_bold = re.compile(r'_\*\*([a-z]+)\*__')
+        self._pat_star_under_bold = re.compile(r'\*_\*\*([^*]+?)\*__')
+        self._pat_double_under = re.compile(r'__([^_\s][^_]*?[^_\s])__')
+        self._pat_single_under = re.compile(r'(?<!\w)_([^_\s][^_]*?[^_\s])_(?!\w)')
+        self._pat_bold_space_after = re.compile(r'\*\*\s+')
+        self._pat_bold_space_before = re.compile(r'\s+\*\*')
+        self._pat_star_space_after = re.compile(r'\*\s+')
+        self._pat_star_space_before = re.compile(r'\s+\*(?!\*)')
+        self._pat_empty_bold = re.compile(r'\*\*\s*\*\*')
+        self._pat_empty_italic = re.compile(r'\*\s*\*')
+
+        # is_likely_header / process_line
+        self._pat_format_chars = re.compile(r'[*_]')
+        self._pat_header_keywords = re.compile(
+            r'background job|the web side|what is|why|how|choosing|part |lesson|introduction|history',
+            re.IGNORECASE
+        )
+        # First words that are header keywords on their own; multi-word
+        # keywords ('what is', 'part ', ...) are left to the regex
+        self._header_prefixes = frozenset({
+            'why', 'how', 'choosing', 'lesson', 'introduction', 'history'
+        })
+        self._pat_bullet = re.compile(r'\*\s+(.+)$')  # matched against lstripped lines
+        self._pat_leading_stars = re.compile(r'^[*\s]*')
+        self._pat_wrapped_format = re.compile(r'[*_]+([^*_]+)[*_]+')
+
     def clean_text(self, text):
         """Clean up weird characters and formatting artifacts"""
-        replacements = {
-            'Ã¢â‚¬â„¢': "'",
-            'Ã¢â‚¬Å"': '"',
-            'Ã¢â‚¬': '"',
-            'Ã¢â‚¬Ëœ': "'",
-            'â€œ': '"',
-            'â€': '"',
-            'â€™': "'",
-            '\\,': ',',
-        }
-
-        for old, new in replacements.items():
-            text = text.replace(old, new)
-
-        # Remove stray backslashes
-        text = re.sub(r'\\(?![\\*_\[\]])', '', text)
-
-        # Collapse multiple spaces
-        text = re.sub(r'  +', ' ', text)
+        # Fix mojibake and remove stray backslashes; every pattern in the
+        # cleanup pass starts with one of these characters. isascii() is O(1)
+        # on CPython and rules out the mojibake scans for plain ASCII lines.
+        if '\\' in text or (not text.isascii() and ('Ã' in text or 'â' in text)):
+            text = self._pat_cleanup.sub(self._cleanup_replacement, text)
+
+        # Collapse multiple spaces (may join spaces around removed backslashes)
+        if '  ' in text:
+            text = self._pat_multispace.sub(' ', text)
 
         return text
 
+    def _cleanup_replacement(self, match):
+        """Replacement callback for the fused cleanup pattern"""
+        if match.lastgroup == 'replace':
+            return _CLEAN_REPLACEMENTS[match.group(0)]
+        return ''
+
     def normalize_formatting(self, text):
         """Normalize bold and italic formatting to consistent syntax"""
+        # Every substitution below needs a '_' or '*' to match
+        if '_' not in text and '*' not in text:
+            return text
+
         # Remove problematic patterns like __  ** text **  __
-        text = re.sub(r'__\s*\*\*\s*([^*]+?)\s*\*\*\s*__', r'**\1**', text)
-        text = re.sub(r'__\s*_([^_]+?)_\s*__', r'*\1*', text)
+        text = self._pat_nested_bold.sub(r'**\1**', text)
+        text = self._pat_nested_italic.sub(r'*\1*', text)
 
         # Fix malformed patterns like *l*oad*__ or _**evealed*__
-        text = re.sub(r'\*([a-z])\*([a-z]+)\*__', r'**\1\2**', text)
-        text = re.sub(r'_\*\*([a-z]+)\*__', r'**\1**', text)
-        text = re.sub(r'\*_\*\*([^*]+?)\*__', r'**\1**', text)
+        text = self._pat_split_bold.sub(r'**\1\2**', text)
+        text = self._pat_under_star_bold.sub(r'**\1**', text)
+        text = self._pat_star_under_bold.sub(r'**\1**', text)
 
         # Convert standalone __ to ** for bold
-        text = re.sub(r'__([^_\s][^_]*?[^_\s])__', r'**\1**', text)
+        text = self._pat_double_under.sub(r'**\1**', text)
 
         # Convert single _ to * for italics
-        text = re.sub(r'(?<!\w)_([^_\s][^_]*?[^_\s])_(?!\w)', r'*\1*', text)
+        text = self._pat_single_under.sub(r'*\1*', text)
 
         # Clean up spacing around formatting
-        text = re.sub(r'\*\*\s+', '**', text)
-        text = re.sub(r'\s+\*\*', '**', text)
-        text = re.sub(r'\*\s+', '*', text)
-        text = re.sub(r'\s+\*(?!\*)', '*', text)
+        text = self._pat_bold_space_after.sub('**', text)
+        text = self._pat_bold_space_before.sub('**', text)
+        text = self._pat_star_space_after.sub('*', text)
+        text = self._pat_star_space_before.sub('*', text)
 
         # Remove empty formatting
-        text = re.sub(r'\*\*\s*\*\*', '', text)
-        text = re.sub(r'\*\s*\*', '', text)
+        text = self._pat_empty_bold.sub('', text)
+        text = self._pat_empty_italic.sub('', text)
 
         return text
 
-    def is_likely_header(self, line):
-        """Determine if a line should be a header"""
-        line = line.strip()
+    def clean_and_normalize(self, text):
+        """Run clean_text and normalize_formatting as a single pipeline"""
+        # The formatting substitutions depend on each other's output, so they
+        # stay as sequential passes after the fused cleanup pass.
+        return self.normalize_formatting(self.clean_text(text))
 
-        if line.startswith('#'):
+    def is_likely_header(self, stripped):
+        """Determine if a line should be a header
+
+        Callers on the hot path pass the line already stripped.
+        """
+        stripped = stripped.strip()
+
+        if stripped.startswith('#'):
             return True
 
+        # Removing formatting can only shorten the line
+        if len(stripped) < 3:
+            return False
+
+        # Removing formatting never adds or drops '.' or '?', and a header
+        # is either a question or a statement without periods. This rejects
+        # most paragraph text before any regex work.
+        if '.' in stripped and '?' not in stripped:
+            return False
+
         # Remove formatting to check content
-        clean = re.sub(r'[*_]', '', line).strip()
+        if '*' in stripped or '_' in stripped:
+            clean = self._pat_format_chars.sub('', stripped).strip()
+        else:
+            clean = stripped
 
         if len(clean) < 3 or len(clean) > 120:
             return False
 
-        # Check for header indicators
-        is_short_statement = len(clean) < 80 and clean.count('.') == 0
-        has_header_keywords = any(kw in clean.lower() for kw in [
-            'background job', 'the web side', 'what is', 'why', 'how',
-            'choosing', 'part ', 'lesson', 'introduction', 'history'
-        ])
-        ends_with_colon = clean.endswith(':')
-        is_question = clean.endswith('?')
+        # Check for header indicators, cheapest first: questions always
+        # qualify, anything else must be a short statement that ends with a
+        # colon or contains a header keyword
+        if clean.endswith('?'):
+            return True
+
+        is_short_statement = len(clean) < 80 and '.' not in clean
+        if not is_short_statement:
+            return False
+
+        if clean.endswith(':'):
+            return True
+
+        first_word = clean.split(None, 1)[0].lower()
+        return (
+            first_word in self._header_prefixes
+            or bool(self._pat_header_keywords.search(clean))
+        )
+
+    def _classify(self, line):
+        """Classify an rstripped line by its first non-space character
+
+        Returns the line kind and, for bullets, the bullet match.
+        """
+        stripped = line.lstrip()
+        if not stripped:
+            return _LINE_EMPTY, None
+
+        first = stripped[0]
+        if first == '#':
+            return _LINE_HEADING, None
+
+        # Only lines shaped like "* text" are worth running the bullet regex on
+        if first == '*' and len(stripped) > 1 and stripped[1].isspace():
+            bullet_match = self._pat_bullet.match(stripped)
+            if bullet_match:
+                return _LINE_BULLET, bullet_match
 
-        return (is_short_statement and (has_header_keywords or ends_with_colon)) or is_question
+        if self.is_likely_header(stripped):
+            return _LINE_HEADER, None
+
+        return _LINE_TEXT, None
 
     def process_line(self, line):
         """Process a single line appropriately"""
         line = line.rstrip()
+        kind, bullet_match = self._classify(line)
 
-        if not line.strip():
+        if kind is _LINE_EMPTY:
             return ''
 
         # Already a header
-        if line.strip().startswith('#'):
-            clean = self.clean_text(line)
-            return self.normalize_formatting(clean)
+        if kind is _LINE_HEADING:
+            return self.clean_and_normalize(line)
 
-        # Check for bullet point FIRST
-        bullet_match = re.match(r'^(\s*)\*\s+(.+)$', line)
-        if bullet_match:
-            content = bullet_match.group(2)
+        # Bullet points are checked before header heuristics
+        if kind is _LINE_BULLET:
+            content = bullet_match.group(1)
 
             # Clean and normalize the content
-            content = self.clean_text(content)
-            content = self.normalize_formatting(content)
+            content = self.clean_and_normalize(content)
 
             # Ensure proper indentation (2 spaces for bullets)
-            return f"  * {content}"
-
-        # Check if should be header
-        if self.is_likely_header(line):
-            clean = re.sub(r'^[*\s]*', '', line)  # Remove leading * and spaces
-            clean = re.sub(r'[*_]+([^*_]+)[*_]+', r'\1', clean)  # Remove formatting
+            return _BULLET_PREFIX + content
+
+        # Should be a header
+        if kind is _LINE_HEADER:
+            # Remove leading * and spaces; the pattern is anchored, so
+            # count=1 stops sub() from retrying at every later position
+            clean = self._pat_leading_stars.sub('', line, count=1)
+            # Remove formatting; a header can hold several emphasized spans,
+            # so this one stays unbounded
+            clean = self._pat_wrapped_format.sub(r'\1', clean)
             clean = self.clean_text(clean)
-            return f"# {clean}"
+            return _HEADER_PREFIX + clean
 
         # Regular paragraph text - convert to bullet point by default
-        processed = self.clean_text(line)
-        processed = self.normalize_formatting(processed)
+        processed = self.clean_and_normalize(line)
 
         # Don't wrap entire paragraphs in bold
         if processed.startswith('**') and processed.endswith('**') and processed.count('**') == 2:
             processed = processed[2:-2]
 
         # Convert regular text lines to bullet points
-        return f"  * {processed}"
+        return _BULLET_PREFIX + processed
+
+    def convert_image_path(self, image_line, encoded_name, slide_number=1, match=None):
+        """Convert pptx2md image paths to Slidev-compatible paths
+
+        encoded_name is the presentation name with spaces already encoded.
+        A match of image_pattern against image_line may be passed in to
+        avoid searching the line again.
+        """
+        img_match = match if match is not None else self.image_pattern.search(image_line)
+        if img_match is not None:
+            return self._convert_image_from_match(img_match, encoded_name, slide_number)
+        return image_line
 
-    def convert_image_path(self, image_line, presentation_name, slide_number=1):
-        """Convert pptx2md image paths to Slidev-compatible paths"""
-        img_match = self.image_pattern.search(image_line)
-        if img_match:
-            alt_text = img_match.group(1)
-            original_path = img_match.group(2)
+    def _convert_image_from_match(self, img_match, encoded_name, slide_number=1):
+        """Build the Slidev image line from an image_pattern match"""
+        alt_text = img_match.group(1)
+        original_path = img_match.group(2)
 
-            clean_path = original_path.replace('%5C', '/')
-            filename = clean_path.split('/')[-1]
+        clean_path = original_path.replace('%5C', '/')
+        filename = clean_path.split('/')[-1]
 
-            if filename:
-                encoded_name = presentation_name.replace(' ', '%20')
-                simple_path = f"./img/{encoded_name}/{filename}"
-            else:
-                encoded_name = presentation_name.replace(' ', '%20')
-                simple_path = f"./img/{encoded_name}/slide_{slide_number}.png"
+        if filename:
+            simple_path = f"./img/{encoded_name}/{filename}"
+        else:
+            simple_path = f"./img/{encoded_name}/slide_{slide_number}.png"
 
-            return f"![{alt_text}]({simple_path})"
-        return image_line
+        return f"![{alt_text}]({simple_path})"
 
-    def process_slide_content(self, content, presentation_name, slide_number=1):
-        """Process content for a slide"""
+    def process_slide_content(self, content, presentation_name, slide_number=1,
+                              encoded_name=None):
+        """Process content for a slide
+
+        encoded_name may be passed in by callers that already computed it
+        for the whole presentation.
+        """
         lines = content.split('\n')
         main_content = []
         images = []
+        if encoded_name is None:
+            encoded_name = presentation_name.replace(' ', '%20')
+
+        # Consecutive duplicate bullets are dropped as lines are processed
+        prev_line = None
+
+        # Bound methods hoisted out of the per-line loop
+        find_image = self.image_pattern.search
+        convert_image = self._convert_image_from_match
+        process_line = self.process_line
 
         for line in lines:
-            # Skip empty lines during processing
-            if not line.strip():
+            # Skip empty lines during processing; process_line's own rstrip()
+            # is then a no-op
+            line = line.rstrip()
+            if not line:
                 continue
 
             # Handle images
-            if self.image_pattern.search(line):
-                converted = self.convert_image_path(line, presentation_name, slide_number)
+            img_match = find_image(line)
+            if img_match is not None:
+                converted = convert_image(img_match, encoded_name, slide_number)
                 images.append(converted)
                 continue
 
             # Process the line
-            processed = self.process_line(line)
-            if processed:
-                main_content.append(processed)
-
-        # Clean up consecutive duplicate bullets and excessive empty lines
-        cleaned = []
-        prev_line = None
-        prev_empty = False
+            processed = process_line(line)
 
-        for line in main_content:
-            # Skip if exact duplicate of previous line
-            if line == prev_line:
+            # Skip if empty or an exact duplicate of the previous line. Every
+            # non-empty result carries a '#' or '*' marker, so there are
+            # no blank lines to collapse.
+            if not processed or processed == prev_line:
                 continue
 
-            if line.strip():
-                cleaned.append(line)
-                prev_empty = False
-                prev_line = line
-            elif not prev_empty:
-                cleaned.append('')
-                prev_empty = True
-                prev_line = None
+            main_content.append(processed)
+            prev_line = processed
 
         # Build result
         if images:
-            result = '\n'.join(cleaned)
-            result += '\n\n::right::\n\n'
-            result += '\n\n'.join(images)
-            return result, 'two-cols'
+            parts = ['\n'.join(main_content), '::right::', '\n\n'.join(images)]
+            return '\n\n'.join(parts), LAYOUT_TWOCOLS
         else:
-            return '\n'.join(cleaned), 'default'
+            return '\n'.join(main_content), LAYOUT_DEFAULT
 
     def create_slidev_header(self, title):
         """Create the Slidev header"""
-        return f"""---
-    defaults:
-      layout: two-cols
-    mdc: true
-    fonts:
-      mono: Cascadia Mono
-      sans: Atkinson Hyperlegible
-    layout: cover
-    ---
-
-    # {title}
-    """
+        return _HEADER.format(title=title)
+
+    def _iter_raw_slides(self, markdown_content):
+        """Yield the chunks between '---' separators, like str.split('---')
+
+        Chunks too short to hold a slide are skipped before being sliced.
+        """
+        start = 0
+        while True:
+            end = markdown_content.find('---', start)
+            if end < 0:
+                end = len(markdown_content)
+            # strip() can only shorten a chunk, so this never drops a slide
+            if end - start >= 10:
+                yield markdown_content[start:end]
+            if end == len(markdown_content):
+                return
+            start = end + 3
 
     def convert_to_slidev(self, markdown_content, title, presentation_name):
         """Convert to Slidev format"""
-        raw_slides = markdown_content.split('---')
-        slidev_content = self.create_slidev_header(title)
+        parts = [self.create_slidev_header(title)]
+        encoded_name = presentation_name.replace(' ', '%20')
 
         processed_slides = 0
-        for i, slide_content in enumerate(raw_slides):
+        for slide_content in self._iter_raw_slides(markdown_content):
             slide_content = slide_content.strip()
-            if not slide_content or len(slide_content) < 10:
+            if len(slide_content) < 10:
                 continue
 
             processed_content, layout = self.process_slide_content(
-                slide_content, presentation_name, processed_slides + 1
+                slide_content, presentation_name, processed_slides + 1,
+                encoded_name
             )
 
             if not processed_content.strip():
@@ -232,22 +393,77 @@ class SlidevConverter:
             processed_slides += 1
 
             # Add slide separator
-            if layout == 'full':
-                slidev_content += "---\nlayout: full\n---\n\n"
+            if layout is LAYOUT_FULL:
+                parts.append(_SEP_FULL)
             else:
-                slidev_content += "---\n\n"
+                parts.append(_SEP_DEFAULT)
 
-            slidev_content += processed_content + "\n"
+            parts.append(processed_content)
+            parts.append("\n")
 
         if processed_slides > 0:
-            slidev_content += "\n---\nlayout: end\n---\n"
+            parts.append(_SEP_END)
+
+        return ''.join(parts)
+
+
+def _convert_one(pptx_file, output_dir):
+    """Convert a single presentation; runs in a worker process
+
+    Returns (name, success, error_msg) so failures are reported by the
+    parent process instead of raising across the process boundary.
+    """
+    converter = SlidevConverter()
+    name = pptx_file.name
+    print(f"Processing {name}")
+    basename = pptx_file.stem
+    md_path = output_dir / f"{basename}.md"
+    img_dir = output_dir / "img" / basename
+
+    try:
+        img_dir.mkdir(parents=True, exist_ok=True)
+        convert(
+            ConversionConfig(
+                pptx_path=pptx_file,
+                output_path=md_path,
+                image_dir=img_dir,
+                disable_notes=True,
+                enable_slides=True
+            )
+        )
+
+        if not md_path.exists():
+            return name, False, "Markdown file not created"
+
+        raw = md_path.read_bytes()
+        try:
+            markdown_content = raw.decode('utf-8')
+        except UnicodeDecodeError:
+            markdown_content = raw.decode('latin1')
+        # Match the newline translation text-mode open() used to do
+        if '\r' in markdown_content:
+            markdown_content = markdown_content.replace('\r\n', '\n').replace('\r', '\n')
+
+        if not markdown_content.strip():
+            return name, False, "Empty content"
+
+        title = basename.replace('_', ' ').replace('-', ' ').title()
+        slidev_content = converter.convert_to_slidev(
+            markdown_content, title, basename
+        )
+
+        md_path.write_text(slidev_content, encoding='utf-8')
+
+        return name, True, ''
 
-        return slidev_content
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return name, False, str(e)
 
 
 def convert_presentations():
     """Main conversion function"""
-    converter = SlidevConverter()
     presentations_dir = Path('./presentations')
     output_dir = Path('presentation-conversion')
 
@@ -257,58 +473,24 @@ def convert_presentations():
 
     output_dir.mkdir(exist_ok=True)
 
-    pptx_files = list(presentations_dir.glob('*.pptx'))
+    with os.scandir(presentations_dir) as entries:
+        pptx_files = [
+            Path(entry.path) for entry in entries
+            if entry.name.endswith('.pptx') and entry.is_file()
+        ]
     if not pptx_files:
         print("No .pptx files found")
         return
 
-    for pptx_file in pptx_files:
-        print(f"Processing {pptx_file.name}")
-        basename = pptx_file.stem
-        md_path = output_dir / f"{basename}.md"
-        img_dir = output_dir / "img" / basename
-        img_dir.mkdir(parents=True, exist_ok=True)
-
-        try:
-            convert(
-                ConversionConfig(
-                    pptx_path=pptx_file,
-                    output_path=md_path,
-                    image_dir=img_dir,
-                    disable_notes=True,
-                    enable_slides=True
-                )
-            )
-
-            if not md_path.exists():
-                print(f"Error: Markdown file not created")
-                continue
-
-            try:
-                with open(md_path, 'r', encoding='utf-8') as f:
-                    markdown_content = f.read()
-            except UnicodeDecodeError:
-                with open(md_path, 'r', encoding='latin1') as f:
-                    markdown_content = f.read()
-
-            if not markdown_content.strip():
-                print(f"Warning: Empty content")
-                continue
-
-            title = basename.replace('_', ' ').replace('-', ' ').title()
-            slidev_content = converter.convert_to_slidev(
-                markdown_content, title, basename
-            )
-
-            with open(md_path, 'w', encoding='utf-8') as f:
-                f.write(slidev_content)
-
-            print(f"Successfully converted {pptx_file.name}")
-
-        except Exception as e:
-            print(f"Failed to convert {pptx_file.name}: {e}")
-            import traceback
-            traceback.print_exc()
+    # Each presentation has its own markdown file and image directory, so
+    # files convert independently; processes sidestep the GIL for pptx2md.
+    with ProcessPoolExecutor() as executor:
+        results = executor.map(_convert_one, pptx_files, [output_dir] * len(pptx_files))
+        for name, success, error_msg in results:
+            if success:
+                print(f"Successfully converted {name}")
+            else:
+                print(f"Failed to convert {name}: {error_msg}")
 
 
 if __name__ == "__main__":